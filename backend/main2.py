@@ -3,12 +3,15 @@ import asyncio
 import sys
 import os
 import json
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Dict, List
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from pydantic import BaseModel
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+from fastapi.middleware.gzip import GZipMiddleware
+from langchain_core.messages import AIMessage
 import logging
 
 
@@ -17,33 +20,65 @@ try:
 except Exception:
     AzureOpenAI = None
 
+try:
+    import orjson
+
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:  # optional speedup, stdlib json works the same here
+    json_dumps = json.dumps
+
 # make agents importable
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-# Load environment early so agent modules can read env vars during import
-load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
+# The project .env is loaded by my_agents/__init__.py on the import below
 
 # -------------------------
 # Import the agents
 # -------------------------
-load_dotenv("./.env")
-from my_agents import final_agents 
-from my_agents.conversational_agent import conversational_agent
+from my_agents import final_agents, linkup_tools
+from my_agents.conversational_agent import get_conversational_agent
 LINKUP_API_KEY = os.getenv('LINKUP_API_KEY')
 AZURE_KEY = os.getenv('AZURE_OPENAI_KEY')
 AZURE_ENDPOINT = os.getenv('AZURE_OPENAI_GPT_ENDPOINT')
 # Prefer the generic deployment name if present, otherwise fall back to the GPT-specific var
 AZURE_DEPLOYMENT = os.getenv('AZURE_OPENAI_DEPLOYMENT_NAME')
 
+# -------------------------
+# Logging
+# -------------------------
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
 # -------------------------
 # FastAPI app
 # -------------------------
-app = FastAPI(title="Startup Finder / Scout Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm in the background so the server starts accepting requests at once
+    task = asyncio.create_task(_warm_agents())
+    yield
+    task.cancel()
+
+app = FastAPI(title="Startup Finder / Scout Backend", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=['*'],
     allow_methods=['*'],
     allow_headers=['*']
 )
+# Compress JSON responses (/chat_sync, /linkup_search). Streaming routes
+# opt out through STREAM_HEADERS below.
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+# Streaming responses must reach the client frame by frame: no caching, no
+# buffering in a reverse proxy (nginx honours X-Accel-Buffering) and no gzip,
+# which holds frames back in the compressor. GZipMiddleware passes through
+# any response that already declares a Content-Encoding.
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+    "Content-Encoding": "identity",
+}
 
 # -------------------------
 # Request models
@@ -86,21 +121,23 @@ def _simple_enhance(text: str) -> str:
 # -------------------------
 # AI query enhancement endpoint (STRICT ONE SENTENCE)
 # -------------------------
+@lru_cache(maxsize=1)
+def get_enhance_client():
+    """Build the Azure OpenAI client for query enhancement once, reusing its connection pool."""
+    return AzureOpenAI(
+        azure_endpoint=AZURE_ENDPOINT,
+        api_key=AZURE_KEY,
+        api_version="2024-02-01",
+    )
+
 @app.post("/enhance_query")
 async def enhance_query(payload: EnhanceRequest) -> Dict[str, str]:
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
-    logger = logging.getLogger(__name__)
     text = payload.user_query or ""
-    logger.info(f"Enhance query request received: {text[:100]}")
+    logger.info("Enhance query request received: %s", text[:100])
 
     if AZURE_KEY and AZURE_ENDPOINT and AZURE_DEPLOYMENT and AzureOpenAI:
         try:
-            client = AzureOpenAI(
-                azure_endpoint=AZURE_ENDPOINT,
-                api_key=AZURE_KEY,
-                api_version="2024-02-01",
-            )
-            response = client.chat.completions.create(
+            response = get_enhance_client().chat.completions.create(
                 model=AZURE_DEPLOYMENT,
                 messages=[
                     {
@@ -124,7 +161,7 @@ async def enhance_query(payload: EnhanceRequest) -> Dict[str, str]:
             refined = response.choices[0].message.content.strip()
             return {"refined_query": refined}
         except Exception as e:
-            logger.warning(f"Azure OpenAI failed, using fallback: {e}")
+            logger.warning("Azure OpenAI failed, using fallback: %s", e)
             fallback = _simple_enhance(text)
             return {"refined_query": fallback}
 
@@ -139,33 +176,26 @@ async def linkup_search(payload: LinkupSearchRequest) -> Dict:
     if not LINKUP_API_KEY:
         return {'success': False, 'error': 'LINKUP_API_KEY not configured in environment', 'results': []}
 
-    try:
-        # linkup-sdk 0.9.0 exports from linkup._client
-        try:
-            from linkup._client import LinkupClient
-        except ImportError:
-            from linkup import LinkupClient
-        client = LinkupClient(api_key=LINKUP_API_KEY)
-        response = client.search(
-            query=payload.search_criteria,
-            depth="standard",
-            output_type="searchResults",
-            include_images=False,
-        )
-        if isinstance(response, list):
-            return {'success': True, 'results': response}
-        if isinstance(response, dict):
-            return {'success': True, 'results': response.get('results', [])}
-        return {'success': True, 'results': []}
-
-    except ImportError:
-        return {'success': False, 'error': "linkup package not installed. Run: pip install linkup-sdk", 'results': []}
-    except Exception as e:
-        return {'success': False, 'error': str(e), 'results': []}
+    # Shares the cached client and response normalization with the agents' tool
+    response = await asyncio.to_thread(
+        linkup_tools.linkup_search,
+        linkup_tools.LinkupSearchRequest(query=payload.search_criteria)
+    )
+    if not response.success:
+        return {'success': False, 'error': response.error, 'results': []}
+    return {'success': True, 'results': response.results or []}
 
 # -------------------------
 # SSE runner for Startup Finder / Scout
 # -------------------------
+def _build_thesis(criteria: str, location: str, funding_stage: str) -> str:
+    """Append the optional location / funding stage qualifiers to the criteria in one join."""
+    qualifiers = (
+        (location, " in {}"),
+        (funding_stage if funding_stage.lower() != "any" else "", ", {} stage"),
+    )
+    return criteria + "".join(tmpl.format(v) for v, tmpl in qualifiers if v)
+
 async def run_agent_and_stream(criteria: str, location: str, funding_stage: str, attributes: List[str], email: str):
     """
     Main pipeline:
@@ -175,20 +205,13 @@ async def run_agent_and_stream(criteria: str, location: str, funding_stage: str,
     4. Return results (NO post-filtering - filtering is done by Linkup based on the thesis)
     """
     yield 'event: status\ndata: 🚀 Starting Startup Scout...\n\n'
-    await asyncio.sleep(0.1)
 
     # Build the investment thesis from user input
     # The thesis is the ONLY filter - Linkup will search for companies matching it
-    investment_thesis = criteria
-    if location:
-        investment_thesis += f" in {location}"
-    if funding_stage and funding_stage.lower() != "any":
-        investment_thesis += f", {funding_stage} stage"
+    investment_thesis = _build_thesis(criteria, location, funding_stage)
     
-    print(f"\n{'='*60}")
-    print(f"📋 Investment Thesis: {investment_thesis}")
-    print(f"📊 Attributes to extract: {attributes}")
-    print(f"{'='*60}\n")
+    logger.info("Investment thesis: %s", investment_thesis)
+    logger.info("Attributes to extract: %s", attributes)
 
     yield f'event: status\ndata: 🔍 Searching for: {investment_thesis}\n\n'
 
@@ -196,32 +219,29 @@ async def run_agent_and_stream(criteria: str, location: str, funding_stage: str,
     results = []
     try:
         yield f'event: status\ndata: 🔍 Running consolidated pipeline...\n\n'
-        results = await final_agents.run_pipeline(investment_thesis, attributes)
-        if not isinstance(results, list):
-            # Ensure results is a list
-            results = results if results is not None else []
-            if isinstance(results, dict):
-                results = [results]
+        # Companies arrive as their deep dives finish, so progress shows
+        # long before the slowest one is done
+        async for index, company in final_agents.arun_pipeline_stream(investment_thesis, attributes):
+            results.append((index, company))
+            yield f'event: status\ndata: 🏢 Researched {company.get("name", "company")} ({len(results)})\n\n'
     except Exception as e:
-        print(f"❌ Pipeline failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        results = []
+        # Keep whatever finished before the failure
+        logger.exception("Pipeline failed: %s", e)
+    # The final list keeps discovery order, not completion order
+    results = [company for _, company in sorted(results, key=lambda item: item[0])]
 
-    print(f"✅ Pipeline returned {len(results)} companies")
+    logger.info("Pipeline returned %d companies", len(results))
     yield f'event: status\ndata: 📦 Found {len(results)} companies\n\n'
 
     # Clean up None values
-    cleaned_results = []
-    for c in results:
-        cleaned = {k: (v if v is not None else "N/A") for k, v in c.items()}
-        cleaned_results.append(cleaned)
-    results = cleaned_results
+    results = [
+        {k: (v if v is not None else "N/A") for k, v in c.items()}
+        for c in results
+    ]
 
-    print(f"✅ Final results: {len(results)} companies")
     yield f'event: status\ndata: ✅ Complete! Found {len(results)} companies\n\n'
 
-    final_payload = json.dumps({"success": True, "results": results})
+    final_payload = json_dumps({"success": True, "results": results})
     yield f'event: complete\ndata: {final_payload}\n\n'
 
 # -------------------------
@@ -233,94 +253,131 @@ async def run_scout(payload: StartupFinderRequest):
     """Compatibility route: some frontends post to /run_scout — forward to the same SSE pipeline."""
     return StreamingResponse(
         run_agent_and_stream(payload.search_criteria, payload.location, payload.funding_stage, payload.attributes, payload.email),
-        media_type='text/event-stream'
+        media_type='text/event-stream',
+        headers=STREAM_HEADERS
     )
 
 
+# -------------------------
+# Chat helpers (shared by /chat and /chat_sync)
+# -------------------------
+def _build_messages(message: str, conversation_history: List[dict]) -> List[dict]:
+    """Keep user/assistant turns from the history and append the current message."""
+    messages = [
+        {"role": msg["role"], "content": msg.get("content", "")}
+        for msg in conversation_history
+        if msg.get("role") in ("user", "assistant")
+    ]
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+def _extract_response(result: dict):
+    """Return (response_text, tool_used) from a conversational agent result."""
+    response_messages = result.get("messages", [])
+
+    # First tool the agent called, if any; only AI messages carry tool calls
+    tool_used = next(
+        (msg.tool_calls[0]['name'] for msg in response_messages
+         if isinstance(msg, AIMessage) and msg.tool_calls),
+        None
+    )
+
+    if response_messages:
+        last_message = response_messages[-1]
+        # Get content from the last message
+        if hasattr(last_message, 'content'):
+            response_text = last_message.content
+        else:
+            response_text = str(last_message)
+    else:
+        response_text = "No response generated."
+
+    return response_text, tool_used
+
+
 # -------------------------
 # Chat endpoint (Conversational Agent) - SSE Streaming
 # -------------------------
-async def chat_stream_generator(message: str, conversation_history: List[dict]):
+async def chat_events(message: str, conversation_history: List[dict]):
     """
-    SSE generator for chat endpoint with status updates.
+    Yield (event, data) pairs for the chat endpoint.
+    Status events carry plain text; complete/error events carry the final payload dict.
     """
-    import time
-    
     try:
-        yield 'event: status\ndata: 🤖 Processing your request...\n\n'
-        await asyncio.sleep(0.1)
+        yield 'status', '🤖 Processing your request...'
         
         # Build messages list with history
-        messages = []
+        messages = _build_messages(message, conversation_history)
         
-        # Add conversation history
-        for msg in conversation_history:
-            if msg.get("role") == "user":
-                messages.append({"role": "user", "content": msg.get("content", "")})
-            elif msg.get("role") == "assistant":
-                messages.append({"role": "assistant", "content": msg.get("content", "")})
+        yield 'status', '🔍 Analyzing query and selecting tools...'
         
-        # Add current message
-        messages.append({"role": "user", "content": message})
-        
-        yield 'event: status\ndata: 🔍 Analyzing query and selecting tools...\n\n'
-        await asyncio.sleep(0.1)
-        
-        # Invoke agent with full conversation history
-        result = conversational_agent.invoke({"messages": messages})
+        # Stream the agent's state so a tool call is reported as soon as the
+        # model picks it, while the (slow) tool is still running
+        result = {}
+        async for state in get_conversational_agent().astream({"messages": messages}, stream_mode="values"):
+            result = state
+            last_message = state["messages"][-1] if state.get("messages") else None
+            for call in getattr(last_message, 'tool_calls', None) or []:
+                tool_name = call.get('name') if isinstance(call, dict) else call.name
+                yield 'status', f'🛠️ Using tool: {tool_name}...'
         
-        # Extract the final response from messages
-        response_messages = result.get("messages", [])
+        # Extract the final response and the first tool used
+        response_text, tool_used = _extract_response(result)
         
-        # Check if any tools were used and report
-        tool_used = None
-        for msg in response_messages:
-            if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                tool_used = msg.tool_calls[0].get('name') if isinstance(msg.tool_calls[0], dict) else msg.tool_calls[0].name
-                yield f'event: status\ndata: 🛠️ Using tool: {tool_used}...\n\n'
-                await asyncio.sleep(0.1)
-                break
-        
-        if response_messages:
-            last_message = response_messages[-1]
-            # Get content from the last message
-            if hasattr(last_message, 'content'):
-                response_text = last_message.content
-            else:
-                response_text = str(last_message)
-        else:
-            response_text = "No response generated."
-        
-        yield 'event: status\ndata: ✅ Response ready!\n\n'
-        await asyncio.sleep(0.1)
+        yield 'status', '✅ Response ready!'
         
         # Send final response
-        final_payload = json.dumps({
+        yield 'complete', {
             "success": True,
             "response": response_text,
             "tool_used": tool_used
-        })
-        yield f'event: complete\ndata: {final_payload}\n\n'
+        }
         
     except Exception as e:
-        error_payload = json.dumps({
+        yield 'error', {
             "success": False,
             "response": f"Error: {str(e)}",
             "tool_used": None
-        })
-        yield f'event: error\ndata: {error_payload}\n\n'
+        }
+
+
+async def chat_stream_generator(message: str, conversation_history: List[dict]):
+    """
+    SSE generator for chat endpoint with status updates.
+    """
+    async for event, data in chat_events(message, conversation_history):
+        if isinstance(data, dict):
+            data = json_dumps(data)
+        yield f'event: {event}\ndata: {data}\n\n'
+
+
+async def chat_ndjson_generator(message: str, conversation_history: List[dict]):
+    """
+    ND-JSON generator for chat endpoint: one {"event", "data"} object per line.
+    """
+    async for event, data in chat_events(message, conversation_history):
+        yield json_dumps({"event": event, "data": data}) + '\n'
 
 
 @app.post('/chat')
-async def chat(payload: ChatRequest):
+async def chat(payload: ChatRequest, request: Request):
     """
     Conversational endpoint with SSE streaming.
     Agent decides which tool to use.
     Supports conversation history for context.
+    Clients that accept application/x-ndjson get one JSON object per line instead.
     """
+    if 'application/x-ndjson' in request.headers.get('accept', ''):
+        return StreamingResponse(
+            chat_ndjson_generator(payload.message, payload.conversation_history),
+            media_type='application/x-ndjson',
+            headers=STREAM_HEADERS
+        )
     return StreamingResponse(
         chat_stream_generator(payload.message, payload.conversation_history),
-        media_type='text/event-stream'
+        media_type='text/event-stream',
+        headers=STREAM_HEADERS
     )
 
 
@@ -334,39 +391,11 @@ async def chat_sync(payload: ChatRequest):
     """
     try:
         # Build messages list with history
-        messages = []
-        
-        # Add conversation history
-        for msg in payload.conversation_history:
-            if msg.get("role") == "user":
-                messages.append({"role": "user", "content": msg.get("content", "")})
-            elif msg.get("role") == "assistant":
-                messages.append({"role": "assistant", "content": msg.get("content", "")})
-        
-        # Add current message
-        messages.append({"role": "user", "content": payload.message})
+        messages = _build_messages(payload.message, payload.conversation_history)
         
         # Invoke agent with full conversation history
-        result = conversational_agent.invoke({"messages": messages})
-        
-        # Extract the final response from messages
-        response_messages = result.get("messages", [])
-        if response_messages:
-            last_message = response_messages[-1]
-            # Get content from the last message
-            if hasattr(last_message, 'content'):
-                response_text = last_message.content
-            else:
-                response_text = str(last_message)
-        else:
-            response_text = "No response generated."
-        
-        # Check if any tools were used
-        tool_used = None
-        for msg in response_messages:
-            if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                tool_used = msg.tool_calls[0].get('name') if isinstance(msg.tool_calls[0], dict) else msg.tool_calls[0].name
-                break
+        result = get_conversational_agent().invoke({"messages": messages})
+        response_text, tool_used = _extract_response(result)
         
         return {
             "success": True,
@@ -386,4 +415,33 @@ async def chat_sync(payload: ChatRequest):
 # -------------------------
 @app.get("/")
 def root():
-    return {"message": "Startup Finder Backend — LangChain discovery & deep dive agents"}
\ No newline at end of file
+    return {"message": "Startup Finder Backend — LangChain discovery & deep dive agents"}
+
+
+# -------------------------
+# Health / warm-up
+# -------------------------
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+async def _warm_agents() -> None:
+    """Build the cached model, agent graphs, Linkup client and tokenizer."""
+    warmers = (
+        get_conversational_agent,
+        final_agents.get_discovery_agent,
+        final_agents.get_deep_dive_agent,
+        linkup_tools.warm_up,
+    )
+    for warmer in warmers:
+        try:
+            await asyncio.to_thread(warmer)
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", warmer.__name__, e)
+
+@app.post("/warm")
+async def warm():
+    """Build the cached model and agent graphs so the first chat request doesn't pay for it."""
+    await _warm_agents()
+    return {"status": "warm"}
\ No newline at end of file
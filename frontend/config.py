@@ -0,0 +1,47 @@
+"""
+Shared configuration for the AB Scout Streamlit app.
+
+Imported once per server process, so these constants are not rebuilt on
+every script rerun.
+"""
+
+# ==========================================================================
+# BACKEND URL
+# ==========================================================================
+BACKEND_URL = "http://localhost:8000"
+
+# ==========================================================================
+# CHAT DISPLAY
+# ==========================================================================
+# Messages rendered per page; older ones sit behind "Show earlier messages"
+MESSAGE_PAGE_SIZE = 20
+# Conversations listed in the sidebar per page; the rest sit behind "Show more"
+CONVERSATION_PAGE_SIZE = 15
+# Status lines kept visible while a response streams
+STATUS_LOG_SIZE = 5
+# Seconds between UI ticks while waiting on the backend stream
+STATUS_POLL_INTERVAL = 0.25
+
+# ==========================================================================
+# QUICK START PROMPTS
+# ==========================================================================
+# (label, query) pairs shown as chips when there are no messages
+QUICK_START_PROMPTS = (
+    ("Discover Startups", "Find emerging startups in AI healthcare sector"),
+    ("Competitor Analysis", "Analyze competitors of Stripe in payments"),
+    ("Market Research", "Research fintech opportunities in MENA region"),
+)
+
+# ==========================================================================
+# EXPORTS
+# ==========================================================================
+# Column order for CSV/Excel exports (keys produced by parse_companies_from_response)
+EXPORT_COLUMNS = (
+    'Name', 'Website', 'Description', 'Country', 'Founding Year',
+    'Funding Stage', 'ARR', 'Market Sector', 'Relevance Score'
+)
+
+# Placeholder values the agent uses for fields it could not find
+MISSING_VALUES = frozenset({
+    'n/a', 'none', 'unknown', 'not available', 'not publicly available', 'not specified'
+})
@@ -0,0 +1,776 @@
+"""
+Shared stylesheet and static HTML fragments for the AB Scout Streamlit app.
+
+Kept in its own module so these strings are built once per server process
+instead of on every script rerun.
+"""
+
+# ==========================================================================
+# CUSTOM CSS - Clean White & Blue Ombre Professional Theme
+# ==========================================================================
+STYLE_CSS = """
+    /* Import Google Fonts */
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600&display=swap');
+    
+    * {
+        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
+    }
+    
+    /* Main background - white with subtle blue ombre */
+    .main {
+        background: linear-gradient(180deg, #ffffff 0%, #f0f7ff 50%, #e8f4fd 100%);
+    }
+    
+    .stApp {
+        background: linear-gradient(180deg, #ffffff 0%, #f0f7ff 50%, #e8f4fd 100%);
+    }
+    
+    /* Header - minimal */
+    .main-header {
+        text-align: center;
+        padding: 1rem 0 0.5rem 0;
+    }
+    
+    .main-header h1 {
+        color: #1e293b;
+        font-size: 1.25rem;
+        font-weight: 600;
+        margin: 0;
+        letter-spacing: -0.01em;
+    }
+    
+    .main-header p {
+        color: #94a3b8;
+        font-size: 0.75rem;
+        margin: 0.25rem 0 0 0;
+    }
+    
+    /* Message row with avatar */
+    .message-row {
+        display: flex;
+        align-items: flex-start;
+        gap: 10px;
+        margin: 12px 0;
+        animation: fadeIn 0.25s ease-out;
+    }
+    
+    .message-row.user {
+        flex-direction: row-reverse;
+    }
+    
+    @keyframes fadeIn {
+        from { opacity: 0; transform: translateY(8px); }
+        to { opacity: 1; transform: translateY(0); }
+    }
+    
+    /* Avatars */
+    .avatar {
+        width: 32px;
+        height: 32px;
+        border-radius: 50%;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        font-size: 0.75rem;
+        font-weight: 600;
+        flex-shrink: 0;
+    }
+    
+    .avatar.user {
+        background: #0671FF;
+        color: #ffffff;
+    }
+    
+    .avatar.bot {
+        background: #2B1CA9;
+        color: #ffffff;
+    }
+    
+    /* Simple chat bubble - same style for both */
+    .chat-bubble {
+        background: #ffffff;
+        color: #374151;
+        padding: 16px 20px;
+        border-radius: 12px;
+        max-width: 85%;
+        font-size: 0.9rem;
+        line-height: 1.7;
+        border: 1px solid #e5e7eb;
+        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.08);
+    }
+    
+    .chat-bubble.user {
+        background: linear-gradient(135deg, #1680E4 0%, #0671FF 100%);
+        color: #ffffff;
+        border: none;
+    }
+    
+    /* Numbered list styling for company results */
+    .chat-bubble ol {
+        padding-left: 0;
+        margin: 0.5rem 0;
+        list-style: none;
+        counter-reset: item;
+    }
+    
+    .chat-bubble ol > li {
+        counter-increment: item;
+        margin-bottom: 1.25rem;
+        padding-left: 2rem;
+        position: relative;
+    }
+    
+    .chat-bubble ol > li::before {
+        content: counter(item) ".";
+        position: absolute;
+        left: 0;
+        font-weight: 700;
+        color: #2B1CA9;
+        font-size: 1rem;
+    }
+    
+    .chat-bubble ol > li > strong:first-child,
+    .chat-bubble ol > li > p:first-child > strong:first-child {
+        font-size: 1rem;
+        color: #1e293b;
+        display: block;
+        margin-bottom: 0.5rem;
+    }
+    
+    /* Nested unordered list (details) */
+    .chat-bubble ul {
+        list-style: disc;
+        padding-left: 1.25rem;
+        margin: 0.5rem 0;
+    }
+    
+    .chat-bubble ul li {
+        margin-bottom: 0.35rem;
+        color: #555354;
+        font-size: 0.875rem;
+        line-height: 1.6;
+    }
+    
+    .chat-bubble ul li strong {
+        color: #374151;
+        font-weight: 600;
+    }
+    
+    /* Links styling */
+    .chat-bubble a {
+        color: #0671FF;
+        text-decoration: none;
+    }
+    
+    .chat-bubble a:hover {
+        text-decoration: underline;
+    }
+    
+    /* Paragraphs */
+    .chat-bubble p {
+        margin: 0.5rem 0;
+    }
+    
+    .chat-bubble p:first-child {
+        margin-top: 0;
+    }
+    
+    /* Message timestamp */
+    .msg-time {
+        font-size: 0.7rem;
+        color: #9ca3af;
+        margin-top: 10px;
+        padding-top: 8px;
+        border-top: 1px solid #f1f5f9;
+    }
+    
+    .chat-bubble.user .msg-time {
+        color: rgba(255,255,255,0.7);
+        border-top-color: rgba(255,255,255,0.2);
+    }
+    
+    /* Tool badge */
+    .tool-badge {
+        display: inline-block;
+        background: linear-gradient(135deg, #e8f4fd 0%, #f0f0ff 100%);
+        color: #2B1CA9;
+        padding: 4px 10px;
+        border-radius: 6px;
+        font-size: 0.7rem;
+        font-weight: 600;
+        margin-bottom: 12px;
+        border: 1px solid #c7d2fe;
+    }
+    
+    /* Status message */
+    .status-msg {
+        color: #6b7280;
+        font-size: 0.85rem;
+        font-style: italic;
+    }
+    
+    /* Table styling */
+    .chat-bubble table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 0.75rem 0;
+        font-size: 0.85rem;
+        border-radius: 8px;
+        overflow: hidden;
+        border: 1px solid #e5e7eb;
+    }
+    
+    .chat-bubble th {
+        background: #f8fafc;
+        color: #374151;
+        padding: 10px 12px;
+        text-align: left;
+        font-weight: 600;
+        border-bottom: 2px solid #e5e7eb;
+    }
+    
+    .chat-bubble td {
+        padding: 10px 12px;
+        border-bottom: 1px solid #f1f5f9;
+        color: #374151;
+    }
+    
+    .chat-bubble tr:last-child td {
+        border-bottom: none;
+    }
+    
+    .chat-bubble tr:hover td {
+        background: #f8fafc;
+    }
+    
+    /* Sidebar styling */
+    section[data-testid="stSidebar"] {
+        background: #f8fafc;
+        border-right: 1px solid #e2e8f0;
+    }
+    
+    section[data-testid="stSidebar"] > div {
+        padding-top: 0.75rem;
+    }
+    
+    .sidebar-header {
+        padding: 0.75rem 1rem;
+        border-bottom: 1px solid #e2e8f0;
+        margin-bottom: 0.75rem;
+        background: #ffffff;
+    }
+    
+    .sidebar-brand {
+        display: flex;
+        align-items: center;
+        gap: 8px;
+    }
+    
+    .sidebar-logo {
+        width: 28px;
+        height: 28px;
+        background: linear-gradient(135deg, #2B1CA9 0%, #0671FF 100%);
+        border-radius: 6px;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+    }
+    
+    .sidebar-logo svg {
+        width: 14px;
+        height: 14px;
+    }
+    
+    .sidebar-brand-text {
+        font-size: 0.9rem;
+        font-weight: 600;
+        color: #1e293b;
+    }
+    
+    .sidebar-section-title {
+        color: #64748b;
+        font-size: 0.7rem;
+        font-weight: 500;
+        text-transform: uppercase;
+        letter-spacing: 0.05em;
+        padding: 0.5rem 1rem 0.25rem 1rem;
+    }
+    
+    .chat-history-item {
+        padding: 8px 12px;
+        margin: 2px 8px;
+        border-radius: 6px;
+        cursor: pointer;
+        transition: all 0.15s ease;
+        color: #475569;
+        font-size: 0.8rem;
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
+        background: #ffffff;
+        border: 1px solid #e2e8f0;
+    }
+    
+    .chat-history-item:hover {
+        background: #f1f5f9;
+        border-color: #cbd5e1;
+    }
+    
+    .chat-history-item.active {
+        background: #e8f4fd;
+        border-color: #0671FF;
+        color: #2B1CA9;
+    }
+    
+    .sidebar-empty {
+        color: #94a3b8;
+        font-size: 0.8rem;
+        text-align: center;
+        padding: 1rem;
+    }
+    
+    /* Tool badge */
+    .tool-badge {
+        display: inline-block;
+        background: #e8f4fd;
+        color: #0671FF;
+        padding: 2px 8px;
+        border-radius: 10px;
+        font-size: 0.65rem;
+        font-weight: 500;
+        margin-bottom: 6px;
+        border: 1px solid #c7e4fd;
+        text-transform: uppercase;
+        letter-spacing: 0.3px;
+    }
+    
+    /* Status/SSE message */
+    .status-msg {
+        background: #f8fafc;
+        color: #0671FF;
+        padding: 8px 12px;
+        border-radius: 10px;
+        font-size: 0.8rem;
+        border-left: 3px solid #0671FF;
+        display: flex;
+        align-items: center;
+        gap: 8px;
+        max-width: 80%;
+    }
+    
+    .status-msg::before {
+        content: '';
+        width: 6px;
+        height: 6px;
+        background: #0671FF;
+        border-radius: 50%;
+        animation: pulse 1.5s infinite;
+    }
+    
+    .status-elapsed {
+        margin-left: auto;
+        color: #9ca3af;
+        font-variant-numeric: tabular-nums;
+    }
+    
+    @keyframes pulse {
+        0%, 100% { opacity: 1; transform: scale(1); }
+        50% { opacity: 0.4; transform: scale(0.8); }
+    }
+    
+    /* Streaming text animation */
+    .streaming-text {
+        overflow: hidden;
+    }
+    
+    @keyframes typewriter {
+        from { max-height: 0; }
+        to { max-height: 2000px; }
+    }
+    
+    .typing-cursor {
+        display: inline-block;
+        width: 2px;
+        height: 1em;
+        background: #0671FF;
+        margin-left: 2px;
+        animation: blink 0.8s infinite;
+        vertical-align: text-bottom;
+    }
+    
+    @keyframes blink {
+        0%, 50% { opacity: 1; }
+        51%, 100% { opacity: 0; }
+    }
+    
+    /* Input area styling */
+    .stTextInput > div > div > input {
+        background: #ffffff !important;
+        border: 1px solid #e5e7eb !important;
+        border-radius: 10px !important;
+        padding: 12px 16px !important;
+        color: #1e293b !important;
+        font-size: 0.9rem !important;
+        box-shadow: 0 1px 2px rgba(0, 0, 0, 0.04) !important;
+    }
+    
+    .stTextInput > div > div > input::placeholder {
+        color: #9ca3af !important;
+    }
+    
+    .stTextInput > div > div > input:focus {
+        border-color: #0671FF !important;
+        box-shadow: 0 0 0 3px rgba(6, 113, 255, 0.1) !important;
+    }
+    
+    /* Button styling */
+    .stButton > button {
+        background: linear-gradient(135deg, #1680E4 0%, #0671FF 100%) !important;
+        color: #ffffff !important;
+        border: none !important;
+        border-radius: 8px !important;
+        padding: 8px 16px !important;
+        font-weight: 500 !important;
+        font-size: 0.85rem !important;
+        transition: all 0.2s ease !important;
+        box-shadow: 0 1px 3px rgba(6, 113, 255, 0.3) !important;
+    }
+    
+    .stButton > button:hover {
+        background: linear-gradient(135deg, #0671FF 0%, #2B1CA9 100%) !important;
+        transform: translateY(-1px) !important;
+        box-shadow: 0 2px 6px rgba(6, 113, 255, 0.4) !important;
+    }
+    
+    /* Download buttons */
+    .stDownloadButton > button {
+        background: #ffffff !important;
+        color: #0671FF !important;
+        border: 1px solid #e5e7eb !important;
+        border-radius: 6px !important;
+        padding: 6px 12px !important;
+        font-size: 0.75rem !important;
+        font-weight: 500 !important;
+        box-shadow: none !important;
+    }
+    
+    .stDownloadButton > button:hover {
+        background: #f8fafc !important;
+        border-color: #0671FF !important;
+    }
+    
+    /* Hide Streamlit branding */
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    header {visibility: hidden;}
+    
+    /* Scrollbar styling */
+    ::-webkit-scrollbar {
+        width: 5px;
+    }
+    
+    ::-webkit-scrollbar-track {
+        background: transparent;
+    }
+    
+    ::-webkit-scrollbar-thumb {
+        background: #cbd5e1;
+        border-radius: 3px;
+    }
+    
+    ::-webkit-scrollbar-thumb:hover {
+        background: #94a3b8;
+    }
+    
+    /* Footer */
+    .footer {
+        text-align: center;
+        color: #94a3b8;
+        font-size: 0.7rem;
+        padding: 1rem;
+        margin-top: 1rem;
+    }
+    
+    /* Welcome section - compact */
+    .welcome-section {
+        text-align: center;
+        padding: 2rem 1rem 1rem 1rem;
+    }
+    
+    .welcome-title {
+        color: #0f172a;
+        font-size: 1.5rem;
+        font-weight: 600;
+        margin-bottom: 0.25rem;
+        letter-spacing: -0.02em;
+    }
+    
+    .welcome-subtitle {
+        color: #64748b;
+        font-size: 0.85rem;
+        margin-bottom: 1rem;
+    }
+    
+    /* Empty chat state */
+    .chat-empty-state {
+        text-align: center;
+        padding: 3rem 1rem;
+        color: #94a3b8;
+    }
+    
+    .chat-empty-state p {
+        font-size: 0.85rem;
+    }
+    
+    /* Spacer above the input area */
+    .input-spacer {
+        height: 20px;
+    }
+    
+    /* Quick start chips - horizontal bright pills */
+    .quick-start-bar {
+        display: flex;
+        justify-content: center;
+        gap: 10px;
+        padding: 0.75rem 1rem;
+        margin-bottom: 1rem;
+        flex-wrap: wrap;
+    }
+    
+    .quick-chip {
+        background: linear-gradient(135deg, #e8f4fd 0%, #f0f7ff 100%);
+        border: 1px solid #c7e4fd;
+        color: #2B1CA9;
+        padding: 8px 16px;
+        border-radius: 20px;
+        font-size: 0.8rem;
+        font-weight: 500;
+        cursor: pointer;
+        transition: all 0.2s ease;
+        white-space: nowrap;
+    }
+    
+    .quick-chip:hover {
+        background: linear-gradient(135deg, #1680E4 0%, #0671FF 100%);
+        border-color: #0671FF;
+        color: #ffffff;
+        transform: translateY(-1px);
+        box-shadow: 0 4px 12px rgba(6, 113, 255, 0.25);
+    }
+    
+    .quick-chip.alt1 {
+        background: linear-gradient(135deg, #dcfce7 0%, #f0fdf4 100%);
+        border-color: #bbf7d0;
+        color: #166534;
+    }
+    
+    .quick-chip.alt1:hover {
+        background: linear-gradient(135deg, #22c55e 0%, #16a34a 100%);
+        border-color: #22c55e;
+        color: #ffffff;
+    }
+    
+    .quick-chip.alt2 {
+        background: linear-gradient(135deg, #fef3c7 0%, #fffbeb 100%);
+        border-color: #fde68a;
+        color: #92400e;
+    }
+    
+    .quick-chip.alt2:hover {
+        background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%);
+        border-color: #f59e0b;
+        color: #ffffff;
+    }
+    
+    /* Message timestamp */
+    .msg-time {
+        font-size: 0.65rem;
+        color: #94a3b8;
+        margin-top: 4px;
+    }
+    
+    .user-msg .msg-time {
+        text-align: right;
+        color: rgba(255,255,255,0.7);
+    }
+    
+    /* Search input in sidebar */
+    .search-container {
+        padding: 0 0.5rem;
+        margin-bottom: 0.5rem;
+    }
+    
+    /* Quick actions */
+    .quick-actions {
+        display: flex;
+        gap: 6px;
+        margin-top: 8px;
+        flex-wrap: wrap;
+    }
+    
+    .quick-action-btn {
+        background: #f8fafc;
+        border: 1px solid #e5e7eb;
+        color: #64748b;
+        padding: 4px 10px;
+        border-radius: 6px;
+        font-size: 0.7rem;
+        cursor: pointer;
+        transition: all 0.15s ease;
+    }
+    
+    .quick-action-btn:hover {
+        background: #e8f4fd;
+        border-color: #0671FF;
+        color: #0671FF;
+    }
+    
+    /* ========== STYLE NATIVE STREAMLIT CHAT MESSAGES ========== */
+    
+    /* Style assistant messages (white card look) */
+    [data-testid="stChatMessage"][data-testid-role="assistant"] {
+        background: #ffffff !important;
+        border-radius: 12px !important;
+        padding: 20px 24px !important;
+        margin: 16px 0 !important;
+        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.08) !important;
+        border: 1px solid #e5e7eb !important;
+    }
+    
+    /* Style user messages (blue pill on right) */
+    [data-testid="stChatMessage"][data-testid-role="user"] {
+        background: linear-gradient(135deg, #1680E4 0%, #0671FF 100%) !important;
+        color: #ffffff !important;
+        border-radius: 18px 18px 4px 18px !important;
+        padding: 10px 18px !important;
+        margin: 12px 0 !important;
+        max-width: 70% !important;
+        margin-left: auto !important;
+        box-shadow: 0 2px 6px rgba(22, 128, 228, 0.25) !important;
+    }
+    
+    [data-testid="stChatMessage"][data-testid-role="user"] * {
+        color: #ffffff !important;
+    }
+    
+    /* Hide default avatar for cleaner look */
+    [data-testid="stChatMessageAvatarUser"],
+    [data-testid="stChatMessageAvatarAssistant"] {
+        display: none !important;
+    }
+    
+    /* Style content inside chat messages */
+    [data-testid="stChatMessage"] p {
+        margin: 0.5rem 0;
+        line-height: 1.7;
+    }
+    
+    /* Numbered list styling */
+    [data-testid="stChatMessage"] ol {
+        list-style: decimal;
+        padding-left: 1.5rem;
+        margin: 1rem 0;
+    }
+    
+    [data-testid="stChatMessage"] ol > li {
+        margin-bottom: 1.25rem;
+        color: #2B1CA9;
+        font-weight: 500;
+    }
+    
+    /* Nested bullet list */
+    [data-testid="stChatMessage"] ul {
+        list-style: circle;
+        padding-left: 1.5rem;
+        margin: 0.5rem 0;
+    }
+    
+    [data-testid="stChatMessage"] ul li {
+        margin-bottom: 0.35rem;
+        color: #555354;
+        font-size: 0.9rem;
+        font-weight: 400;
+    }
+    
+    /* Tool badge inline code styling */
+    [data-testid="stChatMessage"] code {
+        background: #e8f4fd !important;
+        color: #2B1CA9 !important;
+        padding: 2px 8px !important;
+        border-radius: 4px !important;
+        font-size: 0.85rem !important;
+    }
+    
+    /* Caption (timestamp) styling */
+    [data-testid="stChatMessage"] [data-testid="stCaptionContainer"] {
+        font-size: 0.75rem;
+        color: #9ca3af;
+        margin-top: 12px;
+        padding-top: 8px;
+        border-top: 1px solid #f3f4f6;
+    }
+    
+    /* Status message */
+    .stAlert {
+        background: #f8fafc !important;
+        border-radius: 8px !important;
+        border-left: 3px solid #1680E4 !important;
+    }
+"""
+
+STYLE_TAG = f"<style>{STYLE_CSS}</style>"
+
+
+# ==========================================================================
+# STATIC HTML FRAGMENTS
+# ==========================================================================
+# Sidebar brand header
+SIDEBAR_BRAND_HTML = """
+<div class="sidebar-header">
+    <div class="sidebar-brand">
+        <div class="sidebar-logo">
+            <svg xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="white" stroke-width="2">
+                <path stroke-linecap="round" stroke-linejoin="round" d="M21 21l-6-6m2-5a7 7 0 11-14 0 7 7 0 0114 0z" />
+            </svg>
+        </div>
+        <span class="sidebar-brand-text">AB Scout</span>
+    </div>
+</div>
+"""
+
+# Welcome header shown above the quick start chips
+WELCOME_HTML = """
+<div class="welcome-section">
+    <div class="welcome-title">What can I help you find?</div>
+    <div class="welcome-subtitle">Discover startups, analyze markets, and research opportunities</div>
+</div>
+"""
+
+# Chat area placeholder when there are no messages
+CHAT_EMPTY_HTML = """
+<div class="chat-empty-state">
+    <p>Start a conversation or select a quick action above</p>
+</div>
+"""
+
+# Hides button rows while a request is processing
+HIDE_BUTTONS_TAG = """
+<style>
+div[data-testid="stHorizontalBlock"]:has(button) { display: none !important; }
+</style>
+"""
+
+# Streaming status row; lines go in their own block so <br> breaks inside the flex row
+STATUS_HTML = """
+<div class="message-row">
+    <div class="avatar bot">S</div>
+    <div class="status-msg"><div>{lines}</div><span class="status-elapsed">{elapsed}s</span></div>
+</div>
+"""
+
+# Page footer
+FOOTER_HTML = """
+<div class="footer">
+    © 2025 AB Scout  •  Arab Bank Investment Intelligence  •  Confidential
+</div>
+"""
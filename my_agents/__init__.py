@@ -0,0 +1,12 @@
+import os
+
+from dotenv import load_dotenv
+
+# Loaded once for the whole package: agent modules read their settings at
+# import time, and every one of them is imported through here first.
+load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
+
+# Upload LangSmith traces from a background thread instead of making agent
+# runs wait on them. Set before LangChain is imported; an explicit value in
+# the environment or .env still wins.
+os.environ.setdefault("LANGCHAIN_CALLBACKS_BACKGROUND", "true")
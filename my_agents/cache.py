@@ -0,0 +1,128 @@
+"""
+In-process TTL caches for agent results.
+
+Deep dives and searches are slow and cost tokens, and the same company is
+often researched again within a session (a follow-up question, a competitor
+list that overlaps an earlier search). Results are keyed on a hash of
+everything that shaped them, so a different deployment or prompt misses.
+
+A cache can also be backed by a SQLite file so results survive restarts;
+bump CACHE_VERSION when the stored shape changes to orphan old rows.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from cachetools import TLRUCache
+from pydantic import ValidationError
+
+CACHE_VERSION = 1
+
+
+def prompt_key(*parts) -> str:
+    """Stable SHA-256 key over the parts that determine a result."""
+    return hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+
+def _entry_expiry(_key, entry, _now) -> float:
+    # Entries are (expires, value), so a row loaded from disk keeps its
+    # remaining lifetime instead of starting a fresh TTL
+    return entry[0]
+
+
+class ResultCache:
+    """Thread-safe TTL cache; deep dives run concurrently.
+
+    With a `path` and a pydantic `model`, entries are also written to a
+    SQLite file as JSON and read back on a memory miss. Async callers use
+    aget/aset, which run the disk layer in a worker thread so SQLite I/O
+    never blocks the event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, path: str | None = None, model=None):
+        # Wall-clock timer, so expiries are comparable with the SQLite column
+        self._cache = TLRUCache(maxsize=maxsize, ttu=_entry_expiry, timer=time.time)
+        self._lock = threading.Lock()
+        # Separate lock for SQLite, so a slow commit in a worker thread never
+        # holds up a memory lookup on the event loop
+        self._db_lock = threading.Lock()
+        self._ttl = ttl
+        self._model = model
+        self._db = None
+        if path and model is not None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            # Reads skip expired rows; purge them here so the file doesn't grow forever
+            self._db.execute("DELETE FROM results WHERE expires <= ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, key: str):
+        value = self._get_memory(key)
+        if value is not None or self._db is None:
+            return value
+        return self._load(key)
+
+    async def aget(self, key: str):
+        value = self._get_memory(key)
+        if value is not None or self._db is None:
+            return value
+        return await asyncio.to_thread(self._load, key)
+
+    def set(self, key: str, value) -> None:
+        expires = self._set_memory(key, value)
+        if self._db is not None:
+            self._store(key, value, expires)
+
+    async def aset(self, key: str, value) -> None:
+        expires = self._set_memory(key, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._store, key, value, expires)
+
+    def _get_memory(self, key: str):
+        with self._lock:
+            entry = self._cache.get(key)
+        return None if entry is None else entry[1]
+
+    def _set_memory(self, key: str, value, expires: float | None = None) -> float:
+        if expires is None:
+            expires = time.time() + self._ttl
+        with self._lock:
+            self._cache[key] = (expires, value)
+        return expires
+
+    def _load(self, key: str):
+        """Read an entry from SQLite and promote it to memory until its disk expiry."""
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires FROM results WHERE key = ? AND expires > ?",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            value = self._model.model_validate_json(row[0])
+        except ValidationError:
+            # Written under an older shape without a CACHE_VERSION bump;
+            # drop it and treat it as a miss rather than fail the caller
+            with self._db_lock:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._db.commit()
+            return None
+        self._set_memory(key, value, row[1])
+        return value
+
+    def _store(self, key: str, value, expires: float) -> None:
+        data = value.model_dump_json()
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires) VALUES (?, ?, ?)",
+                (key, data, expires)
+            )
+            self._db.commit()
@@ -1,25 +1,42 @@
+import asyncio
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
-from dotenv import load_dotenv
+from my_agents.cache import CACHE_VERSION, ResultCache, prompt_key
 
-load_dotenv()
 
-
-# Try to import the LangChain `tool` decorator. If LangChain is not
-# installed, provide a no-op decorator so the module can still be imported
-# and used without runtime errors.
+# Try to import LangChain's StructuredTool. If LangChain is not installed,
+# the search tool falls back to the plain function so the module can still
+# be imported and used without runtime errors.
 try:
-	from langchain.tools import tool
+	from langchain_core.tools import StructuredTool
 except Exception:  # pragma: no cover - optional dependency
-	def tool(*_args, **_kwargs):
-		def _decorator(func):
-			return func
+	StructuredTool = None
+
+# Used only to count tokens when trimming page content; it ships with
+# langchain-openai, and a character budget stands in without it.
+try:
+	import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+	tiktoken = None
+
+# Tokens of page content kept per search result. Agents only need the gist
+# of each page, and untrimmed pages dominate the prompt.
+LINKUP_CONTENT_TOKENS = int(os.getenv("LINKUP_CONTENT_TOKENS", "500"))
+
+# Search results handed back to the agent per call. Together with the token
+# budget above this bounds how much one search can add to the prompt.
+LINKUP_MAX_RESULTS = int(os.getenv("LINKUP_MAX_RESULTS", "10"))
 
-		return _decorator
+_WHITESPACE_RE = re.compile(r"\s+")
 
+# Read once; my_agents/__init__.py has loaded .env by the time this runs
+LINKUP_API_KEY = os.getenv("LINKUP_API_KEY")
 
 class LinkupSearchRequest(BaseModel):
 	query: str
@@ -36,18 +53,29 @@ class LinkupSearchResponse(BaseModel):
 	error: Optional[str] = None
 
 
+# Agents repeat searches within and across runs (overlapping companies, the
+# same parent organisation); successful responses are reused for a day and
+# kept on disk so a restart doesn't repeat them. Set LINKUP_CACHE_PATH to an
+# empty string to keep them in memory only.
+search_cache = ResultCache(
+	maxsize=int(os.getenv("LINKUP_CACHE_SIZE", "1024")),
+	ttl=int(os.getenv("LINKUP_CACHE_TTL", str(24 * 3600))),
+	path=os.getenv(
+		"LINKUP_CACHE_PATH",
+		os.path.join(os.path.dirname(__file__), '..', '.cache', 'linkup.sqlite3')
+	),
+	model=LinkupSearchResponse,
+)
+
+
+@lru_cache(maxsize=1)
 def linkup_client():
-	"""Create and return a LinkupClient.
+	"""Create and return the shared LinkupClient (built once per process).
 
 	The function will use the provided `api_key` or fall back to the
 	`LINKUP_API_KEY` environment variable. It will raise a helpful error
 	if no key is available or if the `linkup` SDK is not installed.
 	"""
-	# Normalize to a single `api_key` variable sourced from the argument
-	# or the environment. This keeps naming consistent across the module.
-	
-	api_key = os.getenv("LINKUP_API_KEY")
-	
 	try:
 		# linkup-sdk 0.9.0 exports LinkupClient from linkup._client
 		from linkup._client import LinkupClient  # type: ignore
@@ -59,7 +87,7 @@ def linkup_client():
 				"The `linkup` SDK is not available. Install it with `pip install linkup-sdk`"
 			) from e
 
-	return LinkupClient(api_key=api_key)
+	return LinkupClient(api_key=LINKUP_API_KEY)
 
 
 def linkup_search(request: LinkupSearchRequest) -> LinkupSearchResponse:
@@ -72,51 +100,144 @@ def linkup_search(request: LinkupSearchRequest) -> LinkupSearchResponse:
 	By default the function will read the API key from the `LINKUP_API_KEY`
 	environment variable unless `request.api_key` is provided.
 	"""
+	key = _search_key(request)
+	cached = search_cache.get(key)
+	if cached is not None:
+		return cached
+
 	try:
 		client = linkup_client()
 	except Exception as e:
 		return LinkupSearchResponse(success=False, error=str(e))
 
 	try:
-		# Build kwargs and call the SDK's search method
-		kwargs: Dict[str, Any] = {
-			"query": request.query,
-			"depth": request.depth,
-			"output_type": request.output_type,
-			"include_images": request.include_images,
-		}
-
-		resp = client.search(**kwargs)
-
-		# Normalize raw response into a dict where possible
-		if isinstance(resp, dict):
-			raw = resp
-		else:
-			# Try common attributes on SDK responses
-			if hasattr(resp, "to_dict"):
-				raw = resp.to_dict()
-			elif hasattr(resp, "data"):
-				raw = getattr(resp, "data") or {}
-			else:
-				# Fallback: try to coerce to dict
-				try:
-					raw = dict(resp)
-				except Exception:
-					raw = {"value": resp}
-
-		results = raw.get("results") if isinstance(raw, dict) else None
-
-		return LinkupSearchResponse(success=True, raw=raw, results=results)
+		resp = client.search(**_search_kwargs(request))
+		response = _to_search_response(resp)
+		search_cache.set(key, response)
+		return response
 
 	except Exception as e:
 		return LinkupSearchResponse(success=False, error=str(e))
 
 
+async def alinkup_search(request: LinkupSearchRequest) -> LinkupSearchResponse:
+	"""Async counterpart of `linkup_search`, sharing its cache and normalization.
+
+	Awaits the SDK's `async_search`, so concurrent agents don't each park a
+	worker thread while Linkup answers.
+	"""
+	key = _search_key(request)
+	cached = await search_cache.aget(key)
+	if cached is not None:
+		return cached
+
+	try:
+		client = linkup_client()
+	except Exception as e:
+		return LinkupSearchResponse(success=False, error=str(e))
+
+	try:
+		resp = await client.async_search(**_search_kwargs(request))
+		response = _to_search_response(resp)
+		await search_cache.aset(key, response)
+		return response
+
+	except Exception as e:
+		return LinkupSearchResponse(success=False, error=str(e))
+
+
+def _search_key(request: LinkupSearchRequest) -> str:
+	# Case and spacing differences between agent runs don't change what
+	# Linkup returns, so they share one entry
+	query = _WHITESPACE_RE.sub(" ", request.query).strip().casefold()
+	return prompt_key(CACHE_VERSION, query, request.depth, request.output_type, request.include_images)
+
+
+def _search_kwargs(request: LinkupSearchRequest) -> Dict[str, Any]:
+	"""Build kwargs for the SDK's search methods."""
+	return {
+		"query": request.query,
+		"depth": request.depth,
+		"output_type": request.output_type,
+		"include_images": request.include_images,
+	}
+
+
+def _to_search_response(resp: Any) -> LinkupSearchResponse:
+	"""Normalize a raw SDK response into a LinkupSearchResponse."""
+	# Normalize raw response into a dict where possible
+	if isinstance(resp, dict):
+		raw = resp
+	elif hasattr(resp, "model_dump"):
+		# Current SDKs return pydantic models; checked first so the common
+		# case skips the ladder below and its nested results become dicts
+		raw = resp.model_dump()
+	else:
+		# Try common attributes on SDK responses
+		if hasattr(resp, "to_dict"):
+			raw = resp.to_dict()
+		elif hasattr(resp, "data"):
+			raw = getattr(resp, "data") or {}
+		else:
+			# Fallback: try to coerce to dict
+			try:
+				raw = dict(resp)
+			except Exception:
+				raw = {"value": resp}
+
+	results = raw.get("results") if isinstance(raw, dict) else None
+
+	return LinkupSearchResponse(success=True, raw=raw, results=results)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+	return tiktoken.get_encoding("o200k_base")
+
 
+def trim_content(text: str, max_tokens: int = LINKUP_CONTENT_TOKENS) -> str:
+	"""Collapse whitespace and cut `text` to at most `max_tokens` tokens."""
+	text = _WHITESPACE_RE.sub(" ", text).strip()
+	# Every token is at least one character, so short text needs no encoding
+	if len(text) <= max_tokens:
+		return text
+	if tiktoken is None:
+		return text[:max_tokens * 4]
+	tokens = _encoding().encode(text)
+	if len(tokens) <= max_tokens:
+		return text
+	return _encoding().decode(tokens[:max_tokens])
 
 
-@tool("linkup_search")
-def linkup_search_tool(
+def warm_up() -> None:
+	"""Build the Linkup client and load the tokenizer ahead of the first search."""
+	linkup_client()
+	if tiktoken is not None:
+		_encoding()
+
+
+def _tool_request(query: str, depth: str) -> LinkupSearchRequest:
+	return LinkupSearchRequest(
+		query=query,
+		depth=depth,
+		output_type="searchResults",
+		include_images=False
+	)
+
+
+def _tool_payload(resp: LinkupSearchResponse) -> Dict[str, Any]:
+	# Return dict for tool compatibility. `raw` repeats `results`, so only the
+	# trimmed results go back to the model.
+	payload = resp.model_dump(exclude={"raw"})
+	if payload.get("results"):
+		payload["results"] = payload["results"][:LINKUP_MAX_RESULTS]
+	for result in payload.get("results") or []:
+		if isinstance(result, dict) and isinstance(result.get("content"), str):
+			result["content"] = trim_content(result["content"])
+	return payload
+
+
+def _linkup_search_tool(
 	query: str,
 	depth: str = "standard",
 ) -> Dict[str, Any]:
@@ -131,16 +252,71 @@ def linkup_search_tool(
     Returns:
         Dict[str, Any]: A dictionary containing the search results.
 	"""
-	req = LinkupSearchRequest(
-		query=query,
-		depth=depth,
-		output_type="searchResults",
-		include_images=False	
-		)
-	
-	resp = linkup_search(req)
-	# Return dict for tool compatibility
-	return resp.model_dump()
+	return _tool_payload(linkup_search(_tool_request(query, depth)))
+
+
+async def _alinkup_search_tool(
+	query: str,
+	depth: str = "standard",
+) -> Dict[str, Any]:
+	return _tool_payload(await alinkup_search(_tool_request(query, depth)))
+
+
+# Bound on linkup_search_multi searches in flight, however many queries the
+# model sends: per call on the async path, and across all calls on the sync
+# path, which shares one pool so concurrent deep dives can't stack up threads.
+LINKUP_MULTI_CONCURRENCY = 4
+_multi_search_pool = ThreadPoolExecutor(max_workers=LINKUP_MULTI_CONCURRENCY, thread_name_prefix="linkup-search")
+
+
+def _linkup_search_multi_tool(
+	queries: List[str],
+	depth: str = "standard",
+) -> List[Dict[str, Any]]:
+	"""
+    Runs several independent Linkup web searches at once.
+    Use this instead of repeated linkup_search calls when you already know
+    every query you need, e.g. a company's overview, funding and founding details.
+    Args:
+        queries (List[str]): The search queries to look up on the internet.
+        depth (str, optional): The depth of every search. Defaults to "standard". it can also take "deep".
+    Returns:
+        List[Dict[str, Any]]: One search result dictionary per query, in the same order.
+	"""
+	return list(_multi_search_pool.map(lambda query: _linkup_search_tool(query, depth), queries))
+
+
+async def _alinkup_search_multi_tool(
+	queries: List[str],
+	depth: str = "standard",
+) -> List[Dict[str, Any]]:
+	semaphore = asyncio.Semaphore(LINKUP_MULTI_CONCURRENCY)
+
+	async def _search_one(query: str) -> Dict[str, Any]:
+		async with semaphore:
+			return await _alinkup_search_tool(query, depth)
+
+	return await asyncio.gather(*(_search_one(query) for query in queries))
+
+
+# One tool with both paths: agents run with invoke() use the sync search,
+# agents run with ainvoke() await the SDK's async search directly.
+if StructuredTool is not None:
+	linkup_search_tool = StructuredTool.from_function(
+		func=_linkup_search_tool,
+		coroutine=_alinkup_search_tool,
+		name="linkup_search",
+	)
+	# A deep dive's opening searches don't depend on each other; one call
+	# waits for the slowest of them instead of all of them in turn.
+	linkup_search_multi_tool = StructuredTool.from_function(
+		func=_linkup_search_multi_tool,
+		coroutine=_alinkup_search_multi_tool,
+		name="linkup_search_multi",
+	)
+else:  # pragma: no cover - optional dependency
+	linkup_search_tool = _linkup_search_tool
+	linkup_search_multi_tool = _linkup_search_multi_tool
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+"""
+Shared Azure chat model for every agent.
+
+The conversational, Discovery and Deep Dive agents all use the same
+deployment and settings. Building the model once means one underlying
+HTTP client, so they share a warm connection pool instead of each paying
+its own TCP and TLS setup.
+"""
+import os
+from functools import lru_cache
+
+from langchain_core.globals import set_llm_cache
+from langchain_openai import AzureChatOpenAI
+
+AZURE_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME") or os.getenv("AZURE_OPENAI_GPT_DEPLOYMENT_NAME")
+AZURE_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+AZURE_KEY = os.getenv("AZURE_OPENAI_KEY")
+
+# Discovery only picks companies out of search results, so it can run on a
+# smaller, faster deployment. Defaults to the main one.
+DISCOVERY_DEPLOYMENT = os.getenv("AZURE_OPENAI_DISCOVERY_DEPLOYMENT_NAME") or AZURE_DEPLOYMENT
+
+# Optional cap on completion tokens per call; unset keeps the deployment default
+LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "0")) or None
+
+# Opt-in cache of completions keyed on the exact messages and model settings.
+# "memory" keeps them for the life of the process; any other value is a SQLite
+# file (needs langchain-community). Temperature is 0, so a hit returns what
+# the model would have answered anyway.
+LLM_CACHE = os.getenv("LLM_CACHE", "")
+
+
+def _configure_llm_cache() -> None:
+    """Install the global LangChain LLM cache selected by LLM_CACHE, if any."""
+    if not LLM_CACHE:
+        return
+    if LLM_CACHE == "memory":
+        from langchain_core.caches import InMemoryCache
+        set_llm_cache(InMemoryCache())
+        return
+    from langchain_community.cache import SQLiteCache
+    os.makedirs(os.path.dirname(LLM_CACHE) or ".", exist_ok=True)
+    set_llm_cache(SQLiteCache(database_path=LLM_CACHE))
+
+
+_configure_llm_cache()
+
+
+def get_model(deployment: str | None = None) -> AzureChatOpenAI:
+    """Return the shared chat model for a deployment (the main one by default)."""
+    return _build_model(deployment or AZURE_DEPLOYMENT)
+
+
+@lru_cache(maxsize=None)
+def _build_model(deployment: str) -> AzureChatOpenAI:
+    """Build one chat model per deployment for the life of the process."""
+    return AzureChatOpenAI(
+        azure_deployment=deployment,
+        api_key=AZURE_KEY,
+        azure_endpoint=AZURE_ENDPOINT,
+        api_version=os.getenv('OPENAI_API_VERSION', '2025-03-01-preview'),
+        temperature=0.0,
+        max_tokens=LLM_MAX_TOKENS,
+    )
@@ -1,50 +1,121 @@
 import os
 import json
+import time
 import asyncio
-import traceback
+import logging
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 # Load .env from project root
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 load_dotenv(os.path.join(ROOT, '.env'))
 
+# Failures are always reported; full tracebacks only with DIAG_LOGLEVEL=DEBUG
+logging.basicConfig(level=os.environ.get('DIAG_LOGLEVEL', 'INFO'), format='%(levelname)s %(name)s: %(message)s')
+log = logging.getLogger('diag')
+
+def log_failure(message, *args, error=None):
+    """Log a caught exception (the current one unless `error` is given), with its traceback when debugging."""
+    exc_info = (error or True) if log.isEnabledFor(logging.DEBUG) else None
+    log.error(message, *args, exc_info=exc_info)
+
+# (label, seconds) for every network step, reported slowest first at the end
+timings = []
+
+@contextmanager
+def timed(label):
+    """Record how long the block took under `label`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((label, time.perf_counter() - start))
+
 print('Loaded .env from', os.path.join(ROOT, '.env'))
-print('LINKUP_API_KEY present:', bool(os.getenv('LINKUP_API_KEY')))
-print('AZURE_OPENAI_KEY present:', bool(os.getenv('AZURE_OPENAI_KEY')))
-
-# Import the agents and tools
-try:
-    import sys
-    # Ensure project root is on sys.path so `my_agents` imports work
-    if ROOT not in sys.path:
-        sys.path.insert(0, ROOT)
-    from my_agents import final_agents_copy as fac
-    from my_agents import linkup_tools
-except Exception as e:
-    print('Failed to import agents or tools:', e)
-    traceback.print_exc()
-    raise
+for key in ('LINKUP_API_KEY', 'AZURE_OPENAI_KEY', 'AZURE_OPENAI_ENDPOINT', 'AZURE_OPENAI_DEPLOYMENT_NAME'):
+    print(f'{key} present:', bool(os.environ.get(key)))
 
-async def run():
-    thesis = 'AI startups in London'
-    attributes = ['Website', 'Founders', 'Total Funding']
+# Deep dive the first few search results, a few at a time; the timeout stops
+# one slow company from holding up the report
+DEEP_DIVE_LIMIT = 4
+DEEP_DIVE_CONCURRENCY = 4
+DEEP_DIVE_TIMEOUT = 120
+
+# The agents pull in LangGraph, LangChain and the Linkup SDK; they are imported
+# when a run starts, so importing this script stays cheap
+fac = linkup_tools = prompts = None
 
-    print('\n--- Running discovery_agent.invoke(...) ---')
+def import_agents():
+    """Import the agents and tools on first use."""
+    global fac, linkup_tools, prompts
+    if fac is not None:
+        return
     try:
-        # discovery_agent.invoke may accept a string or dict; try both
-        res = None
-        try:
-            res = await asyncio.to_thread(fac.discovery_agent.invoke, thesis)
-        except Exception as e:
-            print('discovery_agent.invoke(thesis) failed:', e)
-            res = await asyncio.to_thread(fac.discovery_agent.invoke, {'input': thesis})
+        import sys
+        # Ensure project root is on sys.path so `my_agents` imports work
+        if ROOT not in sys.path:
+            sys.path.insert(0, ROOT)
+        from my_agents import final_agents as fac
+        from my_agents import linkup_tools
+        from my_agents import prompts
+    except Exception as e:
+        log_failure('Failed to import agents or tools: %s', e)
+        raise
 
-        print('Discovery raw result type:', type(res))
-        print('Discovery raw result repr:\n', res)
+async def discover(thesis):
+    """Invoke the Discovery Agent; None if it fails."""
+    try:
+        # discovery_agent.ainvoke may accept a string or dict; try both
+        with timed('discovery'):
+            try:
+                return await fac.get_discovery_agent().ainvoke(thesis)
+            except Exception as e:
+                print('discovery_agent.ainvoke(thesis) failed:', e)
+                return await fac.get_discovery_agent().ainvoke({'input': thesis})
+    except Exception as e:
+        log_failure('Discovery invocation failed: %s', e)
+        return None
 
+async def search(thesis):
+    """Call the programmatic alinkup_search; None if it raises."""
+    try:
+        req = linkup_tools.LinkupSearchRequest(query=thesis)
+        with timed('linkup_search'):
+            return await linkup_tools.alinkup_search(req)
     except Exception as e:
-        print('Discovery invocation failed:')
-        traceback.print_exc()
+        log_failure('Programmatic linkup_search failed: %s', e)
+        return None
+
+async def deep_dive(name, thesis, attributes, semaphore):
+    """Run the Deep Dive Agent on one company and return its raw result."""
+    query = (
+        prompts.DEEP_DIVE_PREAMBLE_TEMPLATE.format(thesis=thesis, attributes=json.dumps(attributes))
+        + prompts.DEEP_DIVE_COMPANY_TEMPLATE.format(name=name)
+    )
+    async with semaphore:
+        with timed(f'deep_dive: {name}'):
+            return await asyncio.wait_for(
+                fac.get_deep_dive_agent().ainvoke({'messages': [{'role': 'user', 'content': query}]}),
+                timeout=DEEP_DIVE_TIMEOUT
+            )
+
+def result_name(result):
+    """Best-effort company name for a raw Linkup search result."""
+    if isinstance(result, dict):
+        return result.get('name') or result.get('title') or result.get('company') or result.get('url')
+    return str(result)
+
+async def run():
+    import_agents()
+    thesis = 'AI startups in London'
+    attributes = ['Website', 'Founders', 'Total Funding']
+
+    # Discovery and the raw search don't depend on each other; run them together
+    print('\n--- Running discovery_agent.ainvoke(...) and alinkup_search(...) ---')
+    res, linkup_resp = await asyncio.gather(discover(thesis), search(thesis))
+
+    print('Discovery raw result type:', type(res))
+    print('Discovery raw result repr:\n', res)
 
     # If discovery returned text, try to parse
     candidate_output = None
@@ -60,39 +131,45 @@ async def run():
 
     print('\nParsed candidate_output:\n', candidate_output)
 
-    # Try programmatic linkup_search
-    print('\n--- Calling programmatic linkup_search(...) ---')
+    print('\n--- Programmatic alinkup_search(...) result ---')
+    print('LinkupSearchResponse type:', type(linkup_resp))
+    # linkup_resp is None when the search raised
     try:
-        req = linkup_tools.LinkupSearchRequest(query=thesis)
-        linkup_resp = linkup_tools.linkup_search(req)
-        print('LinkupSearchResponse type:', type(linkup_resp))
-        print('LinkupSearchResponse success:', getattr(linkup_resp, 'success', None))
-        print('LinkupSearchResponse error:', getattr(linkup_resp, 'error', None))
-        print('LinkupSearchResponse raw keys:', list(getattr(linkup_resp, 'raw', {}).keys()) if getattr(linkup_resp, 'raw', None) else None)
-        print('LinkupSearchResponse results sample:', (getattr(linkup_resp, 'results', None) or [])[:3])
-    except Exception as e:
-        print('Programmatic linkup_search failed:')
-        traceback.print_exc()
+        success, error, raw, results = linkup_resp.success, linkup_resp.error, linkup_resp.raw, linkup_resp.results or []
+    except AttributeError:
+        success = error = raw = None
+        results = []
+    print('LinkupSearchResponse success:', success)
+    print('LinkupSearchResponse error:', error)
+    print('LinkupSearchResponse raw keys:', list(raw.keys()) if raw else None)
+    print('LinkupSearchResponse results sample:', results[:3])
 
-    # If results, run one deep dive
-    results = getattr(linkup_resp, 'results', None) or []
+    # Deep dive the top results concurrently, reporting each as it finishes
     if results:
-        first = results[0]
-        print('\n--- Running deep_dive_agent on first result ---')
-        try:
-            # Normalize to minimal startup dict expected by deep_dive_agent
-            if isinstance(first, dict):
-                startup = {'name': first.get('name') or first.get('title') or first.get('company') or first.get('url')}
+        names = [result_name(r) for r in results[:DEEP_DIVE_LIMIT]]
+        print(f'\n--- Running deep_dive_agent on {len(names)} results ---')
+        semaphore = asyncio.Semaphore(DEEP_DIVE_CONCURRENCY)
+
+        async def named(name):
+            try:
+                return name, await deep_dive(name, thesis, attributes, semaphore), None
+            except Exception as e:
+                return name, None, e
+
+        for finished in asyncio.as_completed([named(name) for name in names]):
+            name, deep_res, error = await finished
+            if isinstance(error, asyncio.TimeoutError):
+                print(f'\nDeep dive for {name} timed out after {DEEP_DIVE_TIMEOUT}s')
+            elif error is not None:
+                log_failure('Deep dive invocation failed for %s: %s', name, error, error=error)
             else:
-                startup = {'name': str(first)}
-            deep_res = await asyncio.to_thread(fac.deep_dive_agent.invoke, {'startup': startup, 'attributes': attributes})
-            print('Deep dive raw result type:', type(deep_res))
-            print('Deep dive raw result repr:\n', deep_res)
-        except Exception as e:
-            print('Deep dive invocation failed:')
-            traceback.print_exc()
+                print(f'\nDeep dive raw result for {name} ({type(deep_res)}):\n', deep_res)
     else:
         print('\nNo results from Linkup search to deep-dive.')
 
+    print('\n--- Slowest steps ---')
+    for label, seconds in sorted(timings, key=lambda t: -t[1])[:5]:
+        print(f'{label}: {seconds * 1000:.1f}ms')
+
 if __name__ == '__main__':
     asyncio.run(run())
@@ -2,6 +2,7 @@
 Test script to run agents directly with logging
 """
 import logging
+import sys
 logging.basicConfig(
     level=logging.DEBUG, 
     format='%(asctime)s %(levelname)s %(name)s: %(message)s'
@@ -19,9 +20,9 @@ results = run_pipeline.invoke({
     'attributes': ['name', 'url', 'description', 'founding_year']
 })
 
-print(f'\nResults ({len(results)} companies):')
+# One write for the whole report instead of a print per line
+lines = [f'\nResults ({len(results)} companies):']
 for i, company in enumerate(results, 1):
-    print(f'\n{i}. {company.get("name", "Unknown")}')
-    for k, v in company.items():
-        if k != 'name':
-            print(f'   - {k}: {v}')
+    lines.append(f'\n{i}. {company.get("name", "Unknown")}')
+    lines.extend(f'   - {k}: {v}' for k, v in company.items() if k != 'name')
+sys.stdout.write('\n'.join(lines) + '\n')